@@ -304,6 +304,10 @@ export class PythonPluginAdapter extends EventEmitter {
           result = await this.handleRegisterCommand(data);
           break;
         
+        case 'registerCommands':
+          result = await this.handleRegisterCommands(data);
+          break;
+        
         case 'registerSchedule':
           result = await this.handleRegisterSchedule(data);
           break;
@@ -316,6 +320,14 @@ export class PythonPluginAdapter extends EventEmitter {
           result = await this.handleStorageSet(data);
           break;
         
+        case 'storage.mget':
+          result = await this.handleStorageMget(data);
+          break;
+        
+        case 'storage.mset':
+          result = await this.handleStorageMset(data);
+          break;
+        
         case 'storage.delete':
           result = await this.handleStorageDelete(data);
           break;
@@ -407,6 +419,19 @@ export class PythonPluginAdapter extends EventEmitter {
     return { success: true };
   }
 
+  /**
+   * 批量注册指令
+   */
+  async handleRegisterCommands(data) {
+    const { plugin, commands = [] } = data;
+    
+    for (const commandData of commands) {
+      await this.handleRegisterCommand({ plugin, ...commandData });
+    }
+    
+    return { success: true, count: commands.length };
+  }
+
   /**
    * 注册定时任务
    */
@@ -439,6 +464,25 @@ export class PythonPluginAdapter extends EventEmitter {
     return this.context.createStorage(this.info.id).set(key, value);
   }
 
+  async handleStorageMget(data) {
+    const { keys = [] } = data;
+    const storage = this.context.createStorage(this.info.id);
+    const values = {};
+    for (const key of keys) {
+      values[key] = storage.get(key);
+    }
+    return values;
+  }
+
+  async handleStorageMset(data) {
+    const { items = {} } = data;
+    const storage = this.context.createStorage(this.info.id);
+    for (const [key, value] of Object.entries(items)) {
+      storage.set(key, value);
+    }
+    return true;
+  }
+
   async handleStorageDelete(data) {
     const { key } = data;
     return this.context.createStorage(this.info.id).delete(key);
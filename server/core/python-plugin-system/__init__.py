@@ -8,13 +8,13 @@ KiBot Python Plugin SDK
 
 try:
     # 尝试相对导入（作为包使用）
-    from .plugin_base import PluginBase, run_plugin
+    from .plugin_base import PluginBase, run_plugin, start_plugin
     from .decorators import command, event, task
     from .cq_parser import CQParser, CQBuilder
     from .startup_check import StartupChecker, check_and_start
 except ImportError:
     # 如果失败，尝试绝对导入（直接运行）
-    from plugin_base import PluginBase, run_plugin
+    from plugin_base import PluginBase, run_plugin, start_plugin
     from decorators import command, event, task
     from cq_parser import CQParser, CQBuilder
     from startup_check import StartupChecker, check_and_start
@@ -23,6 +23,7 @@ __version__ = "1.0.0"
 __all__ = [
     "PluginBase",
     "run_plugin",
+    "start_plugin",
     "command",
     "event", 
     "task",
@@ -118,6 +118,9 @@ class CQBuilder:
     @classmethod
     def at(cls, qq: int) -> str:
         """@某人"""
+        # QQ号为整数时无需转义，直接格式化
+        if type(qq) is int:
+            return f"[CQ:at,qq={qq}]"
         return cls._build('at', qq=qq)
     
     @classmethod
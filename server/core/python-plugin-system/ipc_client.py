@@ -3,13 +3,26 @@ IPC客户端 - 与Node.js主服务器通信
 使用stdin/stdout进行JSON Lines通信
 """
 
+import os
 import sys
 import json
+import stat
 import asyncio
 import uuid
 from typing import Dict, Any, Optional, Callable
 from datetime import datetime
 
+# 可选依赖：安装了orjson时使用其更快的JSON解析
+try:
+    import orjson
+except ImportError:
+    json_loads = json.loads
+else:
+    json_loads = orjson.loads
+
+# stdin单行最大长度（事件数据可能较大，放宽StreamReader默认的64KB限制）
+STDIN_LINE_LIMIT = 16 * 1024 * 1024
+
 
 class IPCClient:
     """IPC通信客户端"""
@@ -19,9 +32,64 @@ class IPCClient:
         self.event_handlers: Dict[str, Callable] = {}
         self.running = False
         self.reader_task = None
+        self.stdin_reader: Optional[asyncio.StreamReader] = None
+        self._stop_event = asyncio.Event()
+    
+    @staticmethod
+    async def open_stdin_reader() -> Optional[asyncio.StreamReader]:
+        """
+        将stdin挂载为异步StreamReader
+        
+        Returns:
+            StreamReader；当前平台/事件循环不支持管道读取时返回None
+        """
+        # Windows的Proactor循环无法注册stdin（fd不是HANDLE），且错误延迟到首次读取时才抛出，
+        # 因此直接使用线程池读取
+        if sys.platform == 'win32':
+            return None
+        
+        # 只挂载管道/套接字：/dev/null、终端等在epoll注册时才失败，读取会一直挂起
+        try:
+            mode = os.fstat(sys.stdin.fileno()).st_mode
+        except (AttributeError, OSError, ValueError):
+            return None
+        if not (stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode)):
+            return None
+        
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=STDIN_LINE_LIMIT)
+        try:
+            await loop.connect_read_pipe(
+                lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+            )
+        except (NotImplementedError, OSError, ValueError):
+            return None
+        return reader
+    
+    @staticmethod
+    async def read_stdin_line(reader: Optional[asyncio.StreamReader] = None) -> str:
+        """
+        从stdin读取一行
+        
+        Args:
+            reader: open_stdin_reader返回的StreamReader，为None时在线程池中阻塞读取
+        
+        Returns:
+            读取到的行（EOF时为空字符串）
+        """
+        if reader is not None:
+            return (await reader.readline()).decode('utf-8')
+        return await asyncio.get_running_loop().run_in_executor(None, sys.stdin.readline)
     
-    async def start(self):
-        """启动IPC客户端"""
+    async def start(self, stdin_reader: Optional[asyncio.StreamReader] = None):
+        """
+        启动IPC客户端
+        
+        Args:
+            stdin_reader: 已挂载到stdin的StreamReader（与初始化读取共用）
+        """
+        if stdin_reader is not None:
+            self.stdin_reader = stdin_reader
         self.running = True
         # 启动消息读取任务
         self.reader_task = asyncio.create_task(self._read_messages())
@@ -29,6 +97,7 @@ class IPCClient:
     async def stop(self):
         """停止IPC客户端"""
         self.running = False
+        self._stop_event.set()
         if self.reader_task:
             self.reader_task.cancel()
             try:
@@ -36,16 +105,18 @@ class IPCClient:
             except asyncio.CancelledError:
                 pass
     
+    async def wait_stopped(self):
+        """等待IPC客户端停止（不轮询，stop()调用后返回）"""
+        await self._stop_event.wait()
+    
     async def _read_messages(self):
         """读取来自Node.js的消息"""
-        loop = asyncio.get_event_loop()
-        
         self._log_info("IPC消息读取循环已启动")
         
         while self.running:
             try:
                 # 从stdin异步读取一行
-                line = await loop.run_in_executor(None, sys.stdin.readline)
+                line = await self.read_stdin_line(self.stdin_reader)
                 
                 if not line:
                     # stdin关闭，退出
@@ -59,7 +130,7 @@ class IPCClient:
                 self._log_info(f"收到消息: {line[:100]}...")  # 只显示前100个字符
                 
                 try:
-                    message = json.loads(line)
+                    message = json_loads(line)
                     await self._handle_message(message)
                 except json.JSONDecodeError as error:
                     self._log_error(f"JSON解析错误: {error}")
@@ -16,23 +16,111 @@ import time
 import traceback
 import sys
 import warnings
+import weakref
+from collections import deque
 from typing import Dict, Any, Optional, Callable, List
-from datetime import datetime
 from functools import wraps
 
 # 使用绝对导入而不是相对导入
 try:
-    from ipc_client import IPCClient
+    from ipc_client import IPCClient, json_loads
     from logger import Logger
     from storage import Storage
     from plugin_context import PluginContext
 except ImportError:
     # 如果作为包导入失败，尝试相对导入
-    from .ipc_client import IPCClient
+    from .ipc_client import IPCClient, json_loads
     from .logger import Logger
     from .storage import Storage
     from .plugin_context import PluginContext
 
+# 可选依赖：安装了uvloop（>=0.18）时由start_plugin使用其事件循环
+try:
+    from uvloop import run as _uvloop_run
+except ImportError:
+    _uvloop_run = None
+
+
+# ==================== 全局警告分发 ====================
+
+# 插件ID -> 插件实例（弱引用），由统一的警告处理器查询
+_PLUGIN_REGISTRY: Dict[str, 'weakref.ref[PluginBase]'] = {}
+_original_showwarning: Optional[Callable] = None
+
+
+def _plugin_warning_handler(message, category, filename, lineno, file=None, line=None):
+    """
+    统一的警告处理器（进程内只安装一次）
+    按文件路径中的目录/文件名查找所属插件，找不到时交给原始处理器
+    """
+    for part in filename.replace('\\', '/').split('/'):
+        ref = _PLUGIN_REGISTRY.get(part)
+        plugin = ref() if ref is not None else None
+        if plugin is not None:
+            # Logger没有warning方法，使用error或debug
+            plugin.logger.error(f'[Warning:{category.__name__}] {message} ({filename}:{lineno})')
+            return
+    
+    if _original_showwarning is not None:
+        _original_showwarning(message, category, filename, lineno, file, line)
+
+
+def _register_warning_plugin(plugin: 'PluginBase'):
+    """将插件加入警告分发表，首次调用时安装统一的警告处理器"""
+    global _original_showwarning
+    if warnings.showwarning is not _plugin_warning_handler:
+        _original_showwarning = warnings.showwarning
+        warnings.showwarning = _plugin_warning_handler
+    _PLUGIN_REGISTRY[plugin._plugin_id] = weakref.ref(plugin)
+
+
+def _unregister_warning_plugin(plugin: 'PluginBase'):
+    """将插件移出警告分发表"""
+    ref = _PLUGIN_REGISTRY.get(plugin._plugin_id)
+    if ref is not None and ref() is plugin:
+        del _PLUGIN_REGISTRY[plugin._plugin_id]
+
+
+class _PerfCounter:
+    """单个命令/事件/任务的性能计数器（使用__slots__，更新时无需字典查找）"""
+    
+    __slots__ = (
+        'total_executions',
+        'successful_executions',
+        'failed_executions',
+        'total_duration',
+        'min_duration',
+        'max_duration',
+        'avg_duration',
+        'last_executions'
+    )
+    
+    def __init__(self):
+        self.total_executions = 0
+        self.successful_executions = 0
+        self.failed_executions = 0
+        self.total_duration = 0
+        self.min_duration = float('inf')
+        self.max_duration = 0
+        self.avg_duration = 0
+        self.last_executions = deque(maxlen=20)  # 只保留最近20次执行记录
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可JSON序列化的结构（时间戳转毫秒）"""
+        return {
+            'total_executions': self.total_executions,
+            'successful_executions': self.successful_executions,
+            'failed_executions': self.failed_executions,
+            'total_duration': self.total_duration,
+            'min_duration': self.min_duration,
+            'max_duration': self.max_duration,
+            'avg_duration': self.avg_duration,
+            'last_executions': [
+                {**e, 'timestamp': e['timestamp'] // 1_000_000}
+                for e in self.last_executions
+            ]
+        }
+
 
 class PluginBase:
     """Python插件基类"""
@@ -46,6 +134,7 @@ class PluginBase:
             context_config: 上下文配置（Node.js提供）
         """
         self.info = plugin_info
+        self._plugin_id = plugin_info['id']
         self.is_enabled = False
         
         # 创建IPC客户端
@@ -66,9 +155,16 @@ class PluginBase:
         # 指令处理器映射
         self._command_handlers: Dict[str, Callable] = {}
         
-        # 定时任务映射
+        # 待向Node.js批量注册的指令
+        self._pending_command_registrations: List[Dict[str, Any]] = []
+        self._command_flush_task: Optional[asyncio.Task] = None
+        
+        # 定时任务映射（任务信息，不含处理器，可直接用于输出）
         self._scheduled_tasks: Dict[str, Dict[str, Any]] = {}
         
+        # 定时任务处理器映射
+        self._task_handlers: Dict[str, Callable] = {}
+        
         # 统计信息
         self.statistics = {
             'command_executions': 0,
@@ -77,15 +173,26 @@ class PluginBase:
             'errors_occurred': 0
         }
         
-        # 性能监控数据
+        # 性能监控数据（名称 -> _PerfCounter）
         self.performance = {
             'command_performance': {},  # 命令性能数据
             'event_performance': {},     # 事件性能数据
             'task_performance': {}       # 任务性能数据
         }
         
-        self.last_activity = datetime.now().timestamp()
-        self.errors: List[Dict[str, Any]] = []
+        # 性能类型 -> 性能数据字典（预先绑定，避免每次记录时重建）
+        self._perf_maps = {
+            'command': self.performance['command_performance'],
+            'event': self.performance['event_performance'],
+            'task': self.performance['task_performance']
+        }
+        
+        # 所有性能数据的累计值，用于O(1)计算平均执行时间
+        self._agg_total_duration = 0.0
+        self._agg_total_executions = 0
+        
+        self.last_activity = time.time()
+        self.errors: deque = deque(maxlen=100)  # 只保留最近100个错误
         
         # 线程安全监控（Python使用异步并发）
         self._concurrent_operations = 0
@@ -119,34 +226,35 @@ class PluginBase:
         # 设置自定义excepthook
         sys.excepthook = custom_excepthook
         
-        # 捕获warnings并记录
-        def custom_warning_handler(message, category, filename, lineno, file=None, line=None):
-            if self.info['id'] in filename:
-                # Logger没有warning方法，使用error或debug
-                self.logger.error(f'[Warning:{category.__name__}] {message} ({filename}:{lineno})')
-        
-        warnings.showwarning = custom_warning_handler
+        # 捕获warnings并记录（所有插件共用一个警告处理器）
+        _register_warning_plugin(self)
         
         self.logger.debug('全局错误处理器已启用')
     
     def _is_plugin_error(self, error: Exception) -> bool:
         """
         判断错误是否来自当前插件
-        通过错误堆栈分析判断
+        逐帧检查堆栈中的文件名，命中即返回，避免格式化整个堆栈
         """
         if not error:
             return False
         
-        tb_str = ''.join(traceback.format_tb(error.__traceback__))
+        plugin_id = self._plugin_id
+        tb = error.__traceback__
+        while tb is not None:
+            if plugin_id in tb.tb_frame.f_code.co_filename:
+                return True
+            tb = tb.tb_next
         
-        # 检查堆栈是否包含插件ID
-        return self.info['id'] in tb_str
+        return False
     
     def _cleanup_global_error_handlers(self):
         """
         清理全局错误处理器
         在插件卸载时调用
         """
+        _unregister_warning_plugin(self)
+        
         if hasattr(self, '_original_excepthook'):
             sys.excepthook = self._original_excepthook
             self.logger.debug('全局错误处理器已清理')
@@ -185,7 +293,9 @@ class PluginBase:
             'type': error_type,
             'source': source,
             'message': str(error),
-            'stack': traceback.format_exc(),
+            # 只提取堆栈帧摘要（不读取源码行、不格式化），输出时再格式化
+            'stack': traceback.TracebackException.from_exception(error, lookup_lines=False)
+                     if isinstance(error, BaseException) else None,
             'timestamp': time.time() * 1000,  # 毫秒时间戳
             'plugin_id': self.info['id'],
             'plugin_name': self.info.get('name', self.info['id'])
@@ -194,10 +304,6 @@ class PluginBase:
         self.errors.append(error_info)
         self.statistics['errors_occurred'] += 1
         
-        # 只保留最近100个错误
-        if len(self.errors) > 100:
-            self.errors.pop(0)
-        
         # 输出错误日志（确保错误可见）
         self.logger.error(f"[{error_type}:{source}] {error_info['message']}")
     
@@ -211,47 +317,48 @@ class PluginBase:
             return
         
         # 选择性能数据字典
-        perf_map = {
-            'command': self.performance['command_performance'],
-            'event': self.performance['event_performance'],
-            'task': self.performance['task_performance']
-        }.get(perf_type, self.performance['command_performance'])
-        
-        if name not in perf_map:
-            perf_map[name] = {
-                'total_executions': 0,
-                'successful_executions': 0,
-                'failed_executions': 0,
-                'total_duration': 0,
-                'min_duration': float('inf'),
-                'max_duration': 0,
-                'avg_duration': 0,
-                'last_executions': []
-            }
+        perf_map = self._perf_maps.get(perf_type)
+        if perf_map is None:
+            perf_map = self.performance['command_performance']
         
-        perf = perf_map[name]
-        perf['total_executions'] += 1
+        perf = perf_map.get(name)
+        if perf is None:
+            perf = perf_map[name] = _PerfCounter()
+        
+        perf.total_executions += 1
         
         if success:
-            perf['successful_executions'] += 1
+            perf.successful_executions += 1
         else:
-            perf['failed_executions'] += 1
+            perf.failed_executions += 1
+        
+        perf.total_duration += duration
+        if duration < perf.min_duration:
+            perf.min_duration = duration
+        if duration > perf.max_duration:
+            perf.max_duration = duration
+        perf.avg_duration = perf.total_duration / perf.total_executions
         
-        perf['total_duration'] += duration
-        perf['min_duration'] = min(perf['min_duration'], duration)
-        perf['max_duration'] = max(perf['max_duration'], duration)
-        perf['avg_duration'] = perf['total_duration'] / perf['total_executions']
+        self._agg_total_duration += duration
+        self._agg_total_executions += 1
         
         # 记录最近执行
-        perf['last_executions'].append({
-            'timestamp': time.time() * 1000,
+        perf.last_executions.append({
+            'timestamp': time.time_ns(),  # 纳秒时间戳，输出时再转换为毫秒
             'duration': duration,
             'success': success
         })
-        
-        # 只保留最近20次执行记录
-        if len(perf['last_executions']) > 20:
-            perf['last_executions'].pop(0)
+    
+    def _enter_op(self):
+        """进入一个并发操作，同时更新最大并发数"""
+        n = self._concurrent_operations + 1
+        self._concurrent_operations = n
+        if n > self._max_concurrent_operations:
+            self._max_concurrent_operations = n
+    
+    def _exit_op(self):
+        """退出一个并发操作"""
+        self._concurrent_operations -= 1
     
     def _record_error(self, error_type: str, source: str, error: Exception):
         """
@@ -283,8 +390,7 @@ class PluginBase:
                     data.get('args', [])
                 )
                 return {'success': True}
-            except Exception as e:
-                import traceback
+            except Exception:
                 traceback.print_exc()
                 raise
         
@@ -295,8 +401,7 @@ class PluginBase:
             try:
                 await self.dispatch_task(data['taskName'])
                 return {'success': True}
-            except Exception as e:
-                import traceback
+            except Exception:
                 traceback.print_exc()
                 raise
         
@@ -310,57 +415,80 @@ class PluginBase:
                     data.get('event', {})
                 )
                 return {'success': True}
-            except Exception as e:
-                import traceback
+            except Exception:
                 traceback.print_exc()
                 raise
         
         self.ipc.on_request('dispatchEvent', dispatch_event_handler)
     
-    # ==================== 事件处理 ====================
+    # ==================== 处理器包装 ====================
     
-    def register_event(self, event_type: str, handler: Callable):
+    def _make_tracked_wrapper(self, kind: str, name: str, handler: Callable,
+                              stat_key: str, on_error: Optional[Callable] = None) -> Callable:
         """
-        注册事件处理器
+        【核心方法 - SDK强制执行】
+        构建带统计、错误记录和性能追踪的处理器包装
+        热路径中用到的属性在注册时绑定为闭包局部变量
         
         Args:
-            event_type: 事件类型 (message, group_join, etc.)
-            handler: 处理函数 async def handler(event)
-        """
-        if event_type not in self._event_handlers:
-            self._event_handlers[event_type] = []
-        
-        # 【强制包装】确保所有事件处理都被追踪，无法被插件绕过
-        async def wrapped_handler(event):
+            kind: 性能/错误类型（'event' 或 'command'）
+            name: 事件类型或指令名称
+            handler: 插件的处理函数
+            stat_key: statistics中需要递增的计数键
+            on_error: 出错时调用 async def on_error(error, *args)；为None时继续抛出错误
+        """
+        statistics = self.statistics
+        record_error = self._PluginBase__record_error_internal
+        record_performance = self._PluginBase__record_performance_internal
+        enter_op = self._enter_op
+        exit_op = self._exit_op
+        monotonic_ns = time.monotonic_ns
+        wall_time = time.time
+        
+        async def wrapped_handler(*args):
             # ========== SDK强制执行：统计数据收集 ==========
-            self.last_activity = datetime.now().timestamp()
-            self.statistics['events_handled'] += 1
-            self._concurrent_operations += 1
-            
-            if self._concurrent_operations > self._max_concurrent_operations:
-                self._max_concurrent_operations = self._concurrent_operations
+            self.last_activity = wall_time()
+            statistics[stat_key] += 1
+            enter_op()
             
-            start_time = time.time()
+            start_ns = monotonic_ns()
             success = True
             
             try:
                 # 执行插件的处理器
-                await handler(event)
+                await handler(*args)
             except Exception as error:
                 success = False
                 
                 # ========== SDK强制执行：错误记录 ==========
-                # 使用正确的name mangling调用
-                self._PluginBase__record_error_internal('event', event_type, error)
+                record_error(kind, name, error)
                 
-                # 继续抛出错误
-                raise
+                if on_error is None:
+                    raise
+                await on_error(error, *args)
             finally:
                 # ========== SDK强制执行：性能记录（无论成功失败都记录） ==========
-                self._concurrent_operations -= 1
-                duration = (time.time() - start_time) * 1000  # 转换为毫秒
-                # 使用正确的name mangling调用
-                self._PluginBase__record_performance_internal('event', event_type, duration, success)
+                exit_op()
+                duration = (monotonic_ns() - start_ns) / 1_000_000  # 转换为毫秒
+                record_performance(kind, name, duration, success)
+        
+        return wrapped_handler
+    
+    # ==================== 事件处理 ====================
+    
+    def register_event(self, event_type: str, handler: Callable):
+        """
+        注册事件处理器
+        
+        Args:
+            event_type: 事件类型 (message, group_join, etc.)
+            handler: 处理函数 async def handler(event)
+        """
+        if event_type not in self._event_handlers:
+            self._event_handlers[event_type] = []
+        
+        # 【强制包装】确保所有事件处理都被追踪，无法被插件绕过（出错时继续抛出）
+        wrapped_handler = self._make_tracked_wrapper('event', event_type, handler, 'events_handled')
         
         self._event_handlers[event_type].append(wrapped_handler)
         self.logger.debug(f"注册事件处理器: {event_type}")
@@ -373,12 +501,16 @@ class PluginBase:
             event_type: 事件类型
             event_data: 事件数据
         """
-        if event_type in self._event_handlers:
-            for handler in self._event_handlers[event_type]:
-                try:
-                    await handler(event_data)
-                except Exception as error:
-                    self.logger.error(f"事件处理器错误: {error}")
+        handlers = self._event_handlers.get(event_type)
+        if not handlers:
+            return
+        
+        log_error = self.logger.error
+        for handler in handlers:
+            try:
+                await handler(event_data)
+            except Exception as error:
+                log_error(f"事件处理器错误: {error}")
     
     # ==================== 指令处理 ====================
     
@@ -391,59 +523,44 @@ class PluginBase:
             handler: 处理函数 async def handler(event, args)
             **options: 指令选项（description, usage, etc.）
         """
-        # 【强制包装】确保所有命令执行都被追踪，无法被插件绕过
-        async def wrapped_handler(event, args):
-            # ========== SDK强制执行：统计数据收集 ==========
-            self.last_activity = datetime.now().timestamp()
-            self.statistics['command_executions'] += 1
-            self._concurrent_operations += 1
-            
-            if self._concurrent_operations > self._max_concurrent_operations:
-                self._max_concurrent_operations = self._concurrent_operations
-            
-            start_time = time.time()
-            success = True
-            
+        # 发送错误消息给用户
+        async def notify_error(error, event, args):
             try:
-                # 执行插件的处理器
-                await handler(event, args)
-            except Exception as error:
-                success = False
-                
-                # ========== SDK强制执行：错误记录 ==========
-                # 使用正确的name mangling调用
-                self._PluginBase__record_error_internal('command', command, error)
-                
-                # 发送错误消息给用户
-                try:
-                    error_msg = f"⚠️ 执行指令 /{command} 时出错：{str(error)}"
-                    await self.send_message(
-                        event.get('user_id'),
-                        error_msg,
-                        event.get('message_type', 'private')
-                    )
-                except:
-                    pass  # 发送错误消息失败不影响主流程
-            finally:
-                # ========== SDK强制执行：性能记录（无论成功失败都记录） ==========
-                self._concurrent_operations -= 1
-                duration = (time.time() - start_time) * 1000  # 转换为毫秒
-                # 使用正确的name mangling调用
-                self._PluginBase__record_performance_internal('command', command, duration, success)
+                error_msg = f"⚠️ 执行指令 /{command} 时出错：{str(error)}"
+                await self.send_message(
+                    event.get('user_id'),
+                    error_msg,
+                    event.get('message_type', 'private')
+                )
+            except:
+                pass  # 发送错误消息失败不影响主流程
+        
+        # 【强制包装】确保所有命令执行都被追踪，无法被插件绕过
+        wrapped_handler = self._make_tracked_wrapper(
+            'command', command, handler, 'command_executions', on_error=notify_error
+        )
         
         self._command_handlers[command] = wrapped_handler
         
-        # 通知Node.js注册指令
-        asyncio.create_task(self._register_command_remote(command, options))
+        # 通知Node.js注册指令（同一轮注册的指令合并为一次请求）
+        self._pending_command_registrations.append({'command': command, **options})
+        if self._command_flush_task is None:
+            self._command_flush_task = asyncio.create_task(self._flush_command_registrations())
         
         self.logger.debug(f"注册指令: /{command}")
     
-    async def _register_command_remote(self, command: str, options: Dict[str, Any]):
-        """向Node.js注册指令"""
-        await self.ipc.send_request('registerCommand', {
-            'command': command,
-            'plugin': self.info['id'],
-            **options
+    async def _flush_command_registrations(self):
+        """向Node.js批量注册指令"""
+        # 让出一次事件循环，收集本轮所有register_command调用
+        await asyncio.sleep(0)
+        
+        commands = self._pending_command_registrations
+        self._pending_command_registrations = []
+        self._command_flush_task = None
+        
+        await self.ipc.send_request('registerCommands', {
+            'plugin': self._plugin_id,
+            'commands': commands
         })
     
     # dispatch_command 方法移至后面统一实现
@@ -517,10 +634,10 @@ class PluginBase:
         
         # 包装处理器
         async def wrapped_handler():
-            self.last_activity = datetime.now().timestamp()
+            self.last_activity = time.time()
             self.statistics['tasks_executed'] += 1
             task_info['execution_count'] += 1
-            task_info['last_executed'] = datetime.now().timestamp()
+            task_info['last_executed'] = time.time()
             
             try:
                 await handler()
@@ -537,7 +654,7 @@ class PluginBase:
         })
         
         # 保存处理器供后续调用
-        self._scheduled_tasks[name]['handler'] = wrapped_handler
+        self._task_handlers[name] = wrapped_handler
         
         self.logger.debug(f"注册定时任务: {name} ({cron})")
     
@@ -550,30 +667,15 @@ class PluginBase:
             event: 事件对象
             args: 指令参数
         """
-        start_time = time.time()
         self.logger.debug(f"开始执行命令: {command}, args={args}")
         
-        if command in self._command_handlers:
-            handler = self._command_handlers[command]
-            try:
-                self.last_activity = datetime.now().timestamp()
-                self.statistics['command_executions'] += 1
-                
-                await handler(event, args or [])
-                
-                duration = int((time.time() - start_time) * 1000)
-                self.logger.debug(f"命令执行成功: {command} (耗时: {duration}ms)")
-                
-            except Exception as error:
-                duration = int((time.time() - start_time) * 1000)
-                self.logger.error(f"命令执行失败: {command} (耗时: {duration}ms)")
-                self.logger.error(f"错误详情: {error}")
-                
-                self._record_error('command', command, error)
-                raise
-        else:
+        handler = self._command_handlers.get(command)
+        if handler is None:
             self.logger.warn(f"未找到指令处理器: {command}")
             raise Exception(f"Unknown command: {command}")
+        
+        # 统计、性能与错误记录由register_command中的包装处理器统一负责
+        await handler(event, args or [])
     
     async def dispatch_task(self, task_name: str):
         """
@@ -582,13 +684,12 @@ class PluginBase:
         Args:
             task_name: 任务名称（不含插件ID前缀）
         """
-        if task_name in self._scheduled_tasks:
-            handler = self._scheduled_tasks[task_name].get('handler')
-            if handler:
-                try:
-                    await handler()
-                except Exception as error:
-                    self.logger.error(f"定时任务执行错误: {error}")
+        handler = self._task_handlers.get(task_name)
+        if handler:
+            try:
+                await handler()
+            except Exception as error:
+                self.logger.error(f"定时任务执行错误: {error}")
     
     # ==================== 配置管理 ====================
     
@@ -615,19 +716,13 @@ class PluginBase:
             },
             'commands': list(self._command_handlers.keys()),
             'events': list(self._event_handlers.keys()),
-            'tasks': [
-                {
-                    'name': name,
-                    **{k: v for k, v in task.items() if k != 'handler'}
-                }
-                for name, task in self._scheduled_tasks.items()
-            ],
-            'errors': self.errors[-10:],  # 最近10个错误
+            'tasks': list(self._scheduled_tasks.values()),
+            'errors': [self._serialize_error(e) for e in list(self.errors)[-10:]],  # 最近10个错误
             'statistics': self.statistics,
             'performance': {
-                'commandPerformance': self.performance['command_performance'],
-                'eventPerformance': self.performance['event_performance'],
-                'taskPerformance': self.performance['task_performance'],
+                'commandPerformance': self._serialize_performance(self.performance['command_performance']),
+                'eventPerformance': self._serialize_performance(self.performance['event_performance']),
+                'taskPerformance': self._serialize_performance(self.performance['task_performance']),
                 'avgExecutionTime': self._calculate_avg_execution_time()
             },
             'threadSafety': {
@@ -638,24 +733,23 @@ class PluginBase:
             }
         }
     
+    @staticmethod
+    def _serialize_error(error_info: Dict[str, Any]) -> Dict[str, Any]:
+        """将错误记录转换为可JSON序列化的结构（按需格式化堆栈）"""
+        stack = error_info['stack']
+        return {**error_info, 'stack': ''.join(stack.format()) if stack is not None else ''}
+    
+    @staticmethod
+    def _serialize_performance(perf_map: Dict[str, _PerfCounter]) -> Dict[str, Dict[str, Any]]:
+        """将性能数据转换为可JSON序列化的结构"""
+        return {name: perf.to_dict() for name, perf in perf_map.items()}
+    
     def _calculate_avg_execution_time(self) -> float:
-        """计算平均执行时间"""
-        all_performance = []
-        
-        for perf_dict in [
-            self.performance['command_performance'],
-            self.performance['event_performance'],
-            self.performance['task_performance']
-        ]:
-            all_performance.extend(perf_dict.values())
-        
-        if not all_performance:
+        """计算平均执行时间（基于记录时维护的累计值）"""
+        if not self._agg_total_executions:
             return 0
         
-        total_duration = sum(p['total_duration'] for p in all_performance)
-        total_executions = sum(p['total_executions'] for p in all_performance)
-        
-        return total_duration / total_executions if total_executions > 0 else 0
+        return self._agg_total_duration / self._agg_total_executions
 
 
 # ==================== 插件启动辅助函数 ====================
@@ -671,21 +765,28 @@ async def run_plugin(plugin_class):
     使用示例:
         if __name__ == '__main__':
             asyncio.run(run_plugin(MyPlugin))
+    
+    一般使用start_plugin启动，它会在可用时使用uvloop事件循环
     """
     import sys
-    import json
+    
+    # Python 3.12+：使用eager任务工厂，一步即可完成的协程无需经过事件循环调度
+    eager_task_factory = getattr(asyncio, 'eager_task_factory', None)
+    if eager_task_factory is not None:
+        asyncio.get_running_loop().set_task_factory(eager_task_factory)
     
     try:
         print(f"🔧 [run_plugin] 等待初始化消息...", file=sys.stderr)
         
-        # 1. 等待load命令
-        init_line = sys.stdin.readline().strip()
+        # 1. 等待load命令（stdin以异步方式读取，并与IPC客户端共用）
+        stdin_reader = await IPCClient.open_stdin_reader()
+        init_line = (await IPCClient.read_stdin_line(stdin_reader)).strip()
         if not init_line:
             raise Exception("未收到初始化消息")
         
         print(f"🔧 [run_plugin] 收到初始化消息: {init_line[:100]}...", file=sys.stderr)
         
-        init_message = json.loads(init_line)
+        init_message = json_loads(init_line)
         
         if init_message.get('action') != 'load':
             raise Exception(f"期望收到load命令，实际收到: {init_message.get('action')}")
@@ -703,7 +804,7 @@ async def run_plugin(plugin_class):
         print(f"🔧 [run_plugin] 插件实例已创建", file=sys.stderr)
         
         # 3. 启动IPC客户端
-        await plugin.ipc.start()
+        await plugin.ipc.start(stdin_reader)
         print(f"✅ IPC客户端已启动", file=sys.stderr)
         
         # 4. 自动注册核心IPC处理器
@@ -747,8 +848,7 @@ async def run_plugin(plugin_class):
         
         # 8. 保持运行
         try:
-            while plugin.ipc.running:
-                await asyncio.sleep(0.1)
+            await plugin.ipc.wait_stopped()
         except asyncio.CancelledError:
             # 正常关闭，不输出错误
             print(f"✅ [run_plugin] 收到关闭信号", file=sys.stderr)
@@ -767,3 +867,20 @@ async def run_plugin(plugin_class):
         traceback.print_exc(file=sys.stderr)
         sys.exit(1)
 
+
+def start_plugin(plugin_class):
+    """
+    启动Python插件（同步入口）
+    安装了uvloop时使用uvloop事件循环运行run_plugin，否则使用asyncio.run
+    
+    Args:
+        plugin_class: 插件类（继承自PluginBase）
+    
+    使用示例:
+        if __name__ == '__main__':
+            start_plugin(MyPlugin)
+    """
+    if _uvloop_run is not None:
+        _uvloop_run(run_plugin(plugin_class))
+    else:
+        asyncio.run(run_plugin(plugin_class))
@@ -5,13 +5,79 @@ Python插件启动检查模块
 
 import sys
 import os
-import importlib.util
-from typing import List, Dict, Tuple
+import re
+from functools import lru_cache
+from typing import List, Dict, Tuple, Optional
+
+# 当前Python版本（进程内不会改变，只计算一次）
+_CURRENT_PYTHON = sys.version_info[:2]
+_CURRENT_PYTHON_VERSION = sys.version.split()[0]
+
+# KiBot SDK模块
+_SDK_MODULES = (
+    'plugin_base',
+    'ipc_client',
+    'logger',
+    'storage',
+    'cq_parser'
+)
+
+# 检查结果：(状态, 消息)，状态为True/False表示通过/失败，None表示提示信息
+CheckResult = Tuple[Optional[bool], str]
+
+
+def _all_passed(results: List[CheckResult]) -> bool:
+    """检查结果中是否没有失败项"""
+    return all(ok is not False for ok, _ in results)
+
+
+# requirements.txt单行解析（PEP 508子集）：包名、extras、版本约束、环境标记、行内注释
+_REQ_RE = re.compile(
+    r'^(?![\w.+\-]+://)'                                     # URL/VCS依赖（如 git+https://），跳过
+    r'([A-Za-z0-9][A-Za-z0-9._\-]*)'                         # 包名
+    r'\s*(?:\[[^\]]*\])?'                                    # extras，如 [socks]
+    r'(?:\s*(===|==|>=|<=|~=|!=|>|<)\s*([^\s,;#]+)'          # 第一个版本约束
+    r'(?:\s*,\s*(?:===|==|>=|<=|~=|!=|>|<)\s*[^\s,;#]+)*)?'  # 其余版本约束，如 ,<2.0
+    r'(?:\s*;[^#]*)?'                                        # 环境标记
+    r'(?:\s+--[^#]*)?'                                       # pip单行选项，如 --hash=...
+    r'\s*(?:#.*)?$'                                          # 行内注释
+)
+
+
+@lru_cache(maxsize=None)
+def _find_spec_cached(name: str):
+    """
+    缓存的importlib.util.find_spec
+    find_spec需要遍历sys.path并访问文件系统，同一模块只查找一次
+    （测试中可调用 _find_spec_cached.cache_clear() 清空缓存）
+    """
+    import importlib.util  # 仅在实际检查包时导入
+    return importlib.util.find_spec(name)
+
+
+@lru_cache(maxsize=None)
+def _parse_version(version: str) -> Tuple[int, ...]:
+    """将版本字符串（如 "3.8"）解析为整数元组"""
+    return tuple(map(int, version.split('.')))
+
+
+@lru_cache(maxsize=8)
+def _python_version_result(required_version: str) -> Tuple[bool, str]:
+    """Python版本检查结果（当前解释器版本不变，按要求版本缓存）"""
+    current_version = _CURRENT_PYTHON_VERSION
+    
+    if _CURRENT_PYTHON >= _parse_version(required_version)[:2]:
+        return True, f"✅ Python版本: {current_version} (要求: >={required_version})"
+    else:
+        return False, f"❌ Python版本不满足要求: {current_version} < {required_version}"
 
 
 class StartupChecker:
     """启动环境检查器"""
     
+    # SDK检查成功后的结果缓存（SDK可用后在进程内不会再变化）
+    _sdk_cache: Optional[Tuple[bool, str]] = None
+    
     @staticmethod
     def check_python_version(required_version: str = "3.8") -> Tuple[bool, str]:
         """
@@ -23,15 +89,7 @@ class StartupChecker:
         Returns:
             (是否满足, 消息)
         """
-        current = sys.version_info
-        required = tuple(map(int, required_version.split('.')))
-        
-        current_version = f"{current.major}.{current.minor}.{current.micro}"
-        
-        if (current.major, current.minor) >= required[:2]:
-            return True, f"✅ Python版本: {current_version} (要求: >={required_version})"
-        else:
-            return False, f"❌ Python版本不满足要求: {current_version} < {required_version}"
+        return _python_version_result(required_version)
     
     @staticmethod
     def check_package(package_name: str, version: str = None) -> Tuple[bool, str]:
@@ -47,17 +105,17 @@ class StartupChecker:
         """
         try:
             # 尝试导入包
-            spec = importlib.util.find_spec(package_name)
+            spec = _find_spec_cached(package_name)
             if spec is None:
                 return False, f"❌ 缺少依赖包: {package_name}"
             
-            # 如果指定了版本，检查版本
+            # 如果指定了版本，从包元数据读取已安装版本（不导入包）
             if version:
+                from importlib.metadata import version as dist_version, PackageNotFoundError
                 try:
-                    module = importlib.import_module(package_name)
-                    installed_version = getattr(module, '__version__', 'unknown')
+                    installed_version = dist_version(package_name)
                     return True, f"✅ {package_name}=={installed_version}"
-                except Exception:
+                except PackageNotFoundError:
                     return True, f"✅ {package_name} (版本未知)"
             
             return True, f"✅ {package_name} 已安装"
@@ -76,105 +134,107 @@ class StartupChecker:
         Returns:
             (是否全部满足, 消息列表)
         """
-        if not os.path.exists(file_path):
-            return True, ["ℹ️ 无requirements.txt文件"]
+        results = StartupChecker._check_requirements(file_path)
+        return _all_passed(results), [msg for _, msg in results]
+    
+    @staticmethod
+    def _check_requirements(file_path: str) -> List[CheckResult]:
+        """
+        检查requirements.txt中的所有依赖
         
-        messages = []
-        all_ok = True
+        Args:
+            file_path: requirements.txt文件路径
+        
+        Returns:
+            [(状态, 消息)]，状态为None表示提示信息
+        """
+        results = []
         
         try:
+            # 直接打开文件（不存在时由FileNotFoundError处理），避免额外的exists调用
             with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            for line in lines:
-                line = line.strip()
-                
-                # 跳过注释和空行
-                if not line or line.startswith('#'):
-                    continue
-                
-                # 解析包名和版本
-                if '>=' in line:
-                    package_name = line.split('>=')[0].strip()
-                    version = line.split('>=')[1].strip()
-                elif '==' in line:
-                    package_name = line.split('==')[0].strip()
-                    version = line.split('==')[1].strip()
-                else:
-                    package_name = line
-                    version = None
-                
-                ok, msg = StartupChecker.check_package(package_name, version)
-                messages.append(msg)
-                
-                if not ok:
-                    all_ok = False
-            
-            return all_ok, messages
+                for line in f:
+                    line = line.strip()
+                    
+                    # 跳过注释和空行
+                    if not line or line.startswith('#'):
+                        continue
+                    
+                    # 解析包名和版本（pip选项如 -r/-e、URL/VCS依赖等无法按包名检查，跳过）
+                    match = _REQ_RE.match(line)
+                    if match is None:
+                        continue
+                    
+                    package_name, _, version = match.groups()
+                    results.append(StartupChecker.check_package(package_name, version))
             
+            return results
+        
+        except FileNotFoundError:
+            return [(None, "ℹ️ 无requirements.txt文件")]
         except Exception as e:
-            return False, [f"❌ 读取requirements.txt失败: {e}"]
+            return [(False, f"❌ 读取requirements.txt失败: {e}")]
     
-    @staticmethod
-    def check_sdk_available() -> Tuple[bool, str]:
-        """检查KiBot SDK是否可用"""
+    @classmethod
+    def check_sdk_available(cls) -> Tuple[bool, str]:
+        """检查KiBot SDK是否可用（成功后缓存结果）"""
+        if cls._sdk_cache is not None:
+            return cls._sdk_cache
+        
         try:
             # 检查SDK模块
-            sdk_modules = [
-                'plugin_base',
-                'ipc_client',
-                'logger',
-                'storage',
-                'cq_parser'
-            ]
-            
-            for module_name in sdk_modules:
-                spec = importlib.util.find_spec(module_name)
+            for module_name in _SDK_MODULES:
+                spec = _find_spec_cached(module_name)
                 if spec is None:
                     return False, f"❌ SDK模块缺失: {module_name}"
             
-            return True, "✅ KiBot Python SDK 可用"
+            cls._sdk_cache = (True, "✅ KiBot Python SDK 可用")
+            return cls._sdk_cache
             
         except Exception as e:
             return False, f"❌ SDK检查失败: {e}"
     
     @classmethod
     def run_all_checks(cls, plugin_dir: str = None, 
-                       required_python: str = "3.8") -> Tuple[bool, List[str]]:
+                       required_python: str = "3.8",
+                       requirements_file: str = None) -> Tuple[bool, List[str]]:
         """
         运行所有启动检查
         
         Args:
             plugin_dir: 插件目录（用于查找requirements.txt）
             required_python: 要求的Python版本
+            requirements_file: 已解析的requirements.txt路径（默认为plugin_dir下的requirements.txt）
         
         Returns:
             (是否全部通过, 消息列表)
         """
-        messages = []
-        all_ok = True
-        
-        # 检查Python版本
-        ok, msg = cls.check_python_version(required_python)
-        messages.append(msg)
-        if not ok:
-            all_ok = False
+        results = cls._collect_checks(plugin_dir, required_python, requirements_file)
+        return _all_passed(results), [msg for _, msg in results]
+    
+    @classmethod
+    def _collect_checks(cls, plugin_dir: str = None,
+                        required_python: str = "3.8",
+                        requirements_file: str = None) -> List[CheckResult]:
+        """
+        运行所有启动检查，保留每条消息的状态
         
-        # 检查SDK
-        ok, msg = cls.check_sdk_available()
-        messages.append(msg)
-        if not ok:
-            all_ok = False
+        Returns:
+            [(状态, 消息)]，状态为None表示提示信息
+        """
+        # 检查Python版本、SDK
+        results = [
+            cls.check_python_version(required_python),
+            cls.check_sdk_available()
+        ]
         
         # 检查依赖包
-        if plugin_dir:
+        if requirements_file is None and plugin_dir:
             requirements_file = os.path.join(plugin_dir, 'requirements.txt')
-            ok, msgs = cls.check_requirements_file(requirements_file)
-            messages.extend(msgs)
-            if not ok:
-                all_ok = False
+        if requirements_file:
+            results.extend(cls._check_requirements(requirements_file))
         
-        return all_ok, messages
+        return results
     
     @classmethod
     def print_check_results(cls, plugin_name: str, plugin_dir: str = None, 
@@ -187,31 +247,35 @@ class StartupChecker:
             plugin_dir: 插件目录
             required_python: 要求的Python版本
         """
-        all_ok, messages = cls.run_all_checks(plugin_dir, required_python)
+        requirements_file = os.path.join(plugin_dir, 'requirements.txt') if plugin_dir else None
+        results = cls._collect_checks(plugin_dir, required_python, requirements_file)
+        all_ok = _all_passed(results)
         
-        # 简化输出格式
+        # 简化输出格式（先拼接全部内容，再一次性写入stderr）
         if all_ok:
             # 只输出成功的关键信息
-            for msg in messages:
-                if '✅' in msg:
-                    print(msg, file=sys.stderr)
-            return True
+            lines = [msg for ok, msg in results if ok]
         else:
             # 输出详细的错误信息
-            print(f"\n{'='*60}", file=sys.stderr)
-            print(f"❌ {plugin_name} - 环境检查失败", file=sys.stderr)
-            print(f"{'='*60}", file=sys.stderr)
-            
-            for msg in messages:
-                print(msg, file=sys.stderr)
-            
-            print(f"{'='*60}", file=sys.stderr)
-            print("提示: 运行以下命令安装依赖:", file=sys.stderr)
-            if plugin_dir:
-                requirements_file = os.path.join(plugin_dir, 'requirements.txt')
-                if os.path.exists(requirements_file):
-                    print(f"  pip install -r {requirements_file}\n", file=sys.stderr)
-            return False
+            separator = '=' * 60
+            lines = ['', separator, f"❌ {plugin_name} - 环境检查失败", separator]
+            lines.extend(msg for _, msg in results)
+            lines.append(separator)
+            lines.append("提示: 运行以下命令安装依赖:")
+            if requirements_file and os.path.exists(requirements_file):
+                lines.append(f"  pip install -r {requirements_file}\n")
+        
+        if lines:
+            sys.stderr.write('\n'.join(lines) + '\n')
+            sys.stderr.flush()
+        
+        return all_ok
+
+
+@lru_cache(maxsize=None)
+def _get_plugin_dir() -> str:
+    """插件目录（启动脚本所在目录，进程内只解析一次）"""
+    return os.path.dirname(os.path.abspath(sys.argv[0]))
 
 
 # 快捷函数
@@ -226,6 +290,5 @@ def check_and_start(plugin_name: str, required_python: str = "3.8") -> bool:
     Returns:
         是否可以启动
     """
-    plugin_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
-    return StartupChecker.print_check_results(plugin_name, plugin_dir, required_python)
+    return StartupChecker.print_check_results(plugin_name, _get_plugin_dir(), required_python)
 
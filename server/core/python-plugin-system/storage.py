@@ -2,7 +2,9 @@
 存储服务 - 通过IPC访问Node.js的存储系统
 """
 
-from typing import Any, Optional
+import asyncio
+from functools import wraps
+from typing import Any, Dict, Iterable, Optional
 
 try:
     from ipc_client import IPCClient
@@ -10,12 +12,41 @@ except ImportError:
     from .ipc_client import IPCClient
 
 
+def _ipc_safe(default: Any):
+    """
+    IPC请求失败时返回默认值的装饰器
+    
+    Args:
+        default: 失败时的返回值；为可调用对象时每次调用它生成新值（如 list、dict）
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            try:
+                return await func(self, *args, **kwargs)
+            except Exception:
+                return default() if callable(default) else default
+        return wrapper
+    return decorator
+
+
 class Storage:
     """插件存储"""
     
     def __init__(self, plugin_id: str, ipc: IPCClient):
         self.plugin_id = plugin_id
         self.ipc = ipc
+        
+        # 只包含plugin_id的请求数据（只读，IPC层只做序列化，可在多次请求间复用）
+        self._id_payload = {'plugin_id': plugin_id}
+        
+        # 延迟写入缓冲（键名 -> 值），由flush()批量写入
+        self._dirty: Dict[str, Any] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_stop: Optional[asyncio.Event] = None
+        
+        # 正在进行中的get请求（键名 -> Task），相同键的并发读取共用一次IPC请求
+        self._inflight: Dict[str, asyncio.Task] = {}
     
     async def get(self, key: str, default_value: Any = None) -> Any:
         """
@@ -28,15 +59,21 @@ class Storage:
         Returns:
             存储的值或默认值
         """
-        try:
-            result = await self.ipc.send_request('storage.get', {
-                'plugin_id': self.plugin_id,
-                'key': key
-            })
-            return result if result is not None else default_value
-        except Exception:
-            return default_value
+        if key in self._dirty:
+            result = self._dirty[key]
+        else:
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._fetch(key))
+                self._inflight[key] = task
+                task.add_done_callback(lambda t: self._forget_inflight(key, t))
+            
+            # shield：某个调用方被取消时不影响其他等待同一请求的调用方
+            result = await asyncio.shield(task)
+        
+        return result if result is not None else default_value
     
+    @_ipc_safe(False)
     async def set(self, key: str, value: Any) -> bool:
         """
         设置存储值
@@ -48,16 +85,60 @@ class Storage:
         Returns:
             是否成功
         """
-        try:
-            await self.ipc.send_request('storage.set', {
-                'plugin_id': self.plugin_id,
-                'key': key,
-                'value': value
-            })
-            return True
-        except Exception:
-            return False
+        self._dirty.pop(key, None)
+        self._inflight.pop(key, None)
+        await self.ipc.send_request('storage.set', {
+            'plugin_id': self.plugin_id,
+            'key': key,
+            'value': value
+        })
+        return True
     
+    async def mget(self, keys: Iterable[str], default_value: Any = None) -> Dict[str, Any]:
+        """
+        批量获取存储值（一次IPC请求）
+        
+        Args:
+            keys: 键名列表
+            default_value: 默认值
+        
+        Returns:
+            键名 -> 存储的值或默认值
+        """
+        keys = list(keys)
+        dirty = self._dirty
+        remote_keys = [key for key in keys if key not in dirty]
+        
+        result = await self._fetch_many(remote_keys) if remote_keys else {}
+        
+        values = {}
+        for key in keys:
+            value = dirty[key] if key in dirty else result.get(key)
+            values[key] = value if value is not None else default_value
+        return values
+    
+    @_ipc_safe(False)
+    async def mset(self, items: Dict[str, Any]) -> bool:
+        """
+        批量设置存储值（一次IPC请求）
+        
+        Args:
+            items: 键名 -> 值
+        
+        Returns:
+            是否成功
+        """
+        items = dict(items)
+        for key in items:
+            self._dirty.pop(key, None)
+            self._inflight.pop(key, None)
+        await self.ipc.send_request('storage.mset', {
+            'plugin_id': self.plugin_id,
+            'items': items
+        })
+        return True
+    
+    @_ipc_safe(False)
     async def delete(self, key: str) -> bool:
         """
         删除存储值
@@ -68,43 +149,135 @@ class Storage:
         Returns:
             是否成功
         """
-        try:
-            await self.ipc.send_request('storage.delete', {
-                'plugin_id': self.plugin_id,
-                'key': key
-            })
-            return True
-        except Exception:
-            return False
+        self._dirty.pop(key, None)
+        self._inflight.pop(key, None)
+        await self.ipc.send_request('storage.delete', {
+            'plugin_id': self.plugin_id,
+            'key': key
+        })
+        return True
     
+    @_ipc_safe(False)
     async def has(self, key: str) -> bool:
         """检查键是否存在"""
-        try:
-            result = await self.ipc.send_request('storage.has', {
-                'plugin_id': self.plugin_id,
-                'key': key
-            })
-            return result
-        except Exception:
-            return False
+        if key in self._dirty:
+            return True
+        
+        return await self.ipc.send_request('storage.has', {
+            'plugin_id': self.plugin_id,
+            'key': key
+        })
     
     async def keys(self) -> list:
-        """获取所有键"""
-        try:
-            result = await self.ipc.send_request('storage.keys', {
-                'plugin_id': self.plugin_id
-            })
-            return result or []
-        except Exception:
-            return []
+        """获取所有键（包含尚未写入的延迟数据）"""
+        result = await self._fetch_keys()
+        
+        if self._dirty:
+            result = list(dict.fromkeys([*result, *self._dirty]))
+        return result
     
+    @_ipc_safe(False)
     async def clear(self) -> bool:
         """清空所有存储"""
+        self._dirty.clear()
+        self._inflight.clear()
+        await self.ipc.send_request('storage.clear', self._id_payload)
+        return True
+    
+    # ==================== 延迟写入 ====================
+    
+    def set_deferred(self, key: str, value: Any):
+        """
+        延迟设置存储值（只写入内存缓冲，不发起IPC请求）
+        缓冲中的数据由flush()或自动刷新任务批量写入
+        
+        Args:
+            key: 键名
+            value: 值
+        """
+        self._dirty[key] = value
+    
+    async def flush(self) -> bool:
+        """
+        将延迟写入的数据批量写入存储
+        
+        Returns:
+            是否成功（没有待写入数据时也返回True）
+        """
+        if not self._dirty:
+            return True
+        
+        items = self._dirty
+        self._dirty = {}
         try:
-            await self.ipc.send_request('storage.clear', {
-                'plugin_id': self.plugin_id
+            await self.ipc.send_request('storage.mset', {
+                'plugin_id': self.plugin_id,
+                'items': items
             })
             return True
         except Exception:
+            # 写入失败时放回缓冲（不覆盖期间产生的新值），等待下次刷新
+            for key, value in items.items():
+                self._dirty.setdefault(key, value)
             return False
-
+    
+    def start_autoflush(self, interval: float = 30.0):
+        """
+        启动自动刷新任务，每隔interval秒写入一次延迟数据
+        
+        Args:
+            interval: 刷新间隔（秒）
+        """
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_stop = asyncio.Event()
+            self._flush_task = asyncio.create_task(
+                self._autoflush_loop(interval, self._flush_stop)
+            )
+    
+    async def stop_autoflush(self):
+        """停止自动刷新任务，并写入剩余的延迟数据"""
+        if self._flush_task is not None:
+            # 不取消任务：正在进行的flush会等待IPC响应，取消后响应到达时无法设置结果
+            self._flush_stop.set()
+            await self._flush_task
+            self._flush_task = None
+            self._flush_stop = None
+        
+        await self.flush()
+    
+    async def _autoflush_loop(self, interval: float, stop: asyncio.Event):
+        """自动刷新循环（stop被设置后在当前刷新完成时退出）"""
+        while True:
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+                return
+            except asyncio.TimeoutError:
+                await self.flush()
+    
+    # ==================== 远程读取 ====================
+    
+    def _forget_inflight(self, key: str, task: asyncio.Task):
+        """请求完成后移除进行中的记录（已被写操作替换时不处理）"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+    
+    @_ipc_safe(None)
+    async def _fetch(self, key: str) -> Any:
+        """从Node.js读取单个值（失败时返回None）"""
+        return await self.ipc.send_request('storage.get', {
+            'plugin_id': self.plugin_id,
+            'key': key
+        })
+    
+    @_ipc_safe(dict)
+    async def _fetch_many(self, keys: list) -> Dict[str, Any]:
+        """从Node.js批量读取（失败时返回空字典）"""
+        return await self.ipc.send_request('storage.mget', {
+            'plugin_id': self.plugin_id,
+            'keys': keys
+        }) or {}
+    
+    @_ipc_safe(list)
+    async def _fetch_keys(self) -> list:
+        """从Node.js读取所有键（失败时返回空列表）"""
+        return await self.ipc.send_request('storage.keys', self._id_payload) or []
@@ -10,20 +10,28 @@ Python示例插件
 import sys
 import os
 import asyncio
+from functools import lru_cache
 
-# 添加SDK路径
-sdk_path = os.path.join(os.path.dirname(__file__), '../../core/python-plugin-system')
-sys.path.insert(0, sdk_path)
+# 添加SDK路径（放在最前面，避免同名的第三方模块覆盖SDK模块；已存在时不重复添加）
+sdk_path = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../core/python-plugin-system'))
+if sdk_path not in sys.path:
+    sys.path.insert(0, sdk_path)
 
 # 启动环境检查
 from startup_check import check_and_start
 if not check_and_start("Python示例插件", required_python="3.8"):
     sys.exit(1)
 
-from plugin_base import PluginBase, run_plugin
+from plugin_base import PluginBase, start_plugin
 from cq_parser import CQBuilder
 
 
+@lru_cache(maxsize=1024)
+def _at_tag(user_id) -> str:
+    """缓存常见用户的@消息段"""
+    return CQBuilder.at(user_id)
+
+
 class ExamplePythonPlugin(PluginBase):
     """Python示例插件类"""
     
@@ -31,14 +39,17 @@ class ExamplePythonPlugin(PluginBase):
         super().__init__(plugin_info, context_config)
         self.message_count = 0
         self.greeting_count = 0
+        self._info_name = plugin_info['name']
+        self._info_version = plugin_info['version']
     
     async def on_load(self):
         """插件加载"""
         await super().on_load()
         
         # 加载统计数据
-        self.message_count = await self.storage.get('message_count', 0)
-        self.greeting_count = await self.storage.get('greeting_count', 0)
+        counts = await self.storage.mget(['message_count', 'greeting_count'], 0)
+        self.message_count = counts['message_count']
+        self.greeting_count = counts['greeting_count']
         
         self.logger.info(f"加载完成 (消息: {self.message_count}, 问候: {self.greeting_count})")
     
@@ -55,6 +66,9 @@ class ExamplePythonPlugin(PluginBase):
         # 注册定时任务（可选）
         # await self.register_tasks()
         
+        # 定期写入延迟保存的数据
+        self.storage.start_autoflush()
+        
         self.logger.info("已启用 (指令: 3, 事件: 2)")
     
     async def register_commands(self):
@@ -101,18 +115,24 @@ class ExamplePythonPlugin(PluginBase):
     
     # ==================== 指令处理器 ====================
     
+    @staticmethod
+    def _resolve_target(event):
+        """根据事件获取回复目标 (chat_id, msg_type)"""
+        msg_type = event.get('message_type', 'private')
+        chat_id = event.get('group_id') if msg_type == 'group' else event.get('user_id')
+        return chat_id, msg_type
+    
     async def handle_hello(self, event, args):
         """处理问候指令"""
         name = args[0] if args else '朋友'
         
         # 构建带@的回复消息
-        message = f"{CQBuilder.at(event['user_id'])} 你好，{name}！\n"
+        message = f"{_at_tag(event['user_id'])} 你好，{name}！\n"
         message += f"这是来自Python插件的问候！🐍\n"
         message += f"我已经问候了 {self.greeting_count + 1} 次了！"
         
         # 发送消息
-        msg_type = event.get('message_type', 'private')
-        chat_id = event.get('group_id') if msg_type == 'group' else event.get('user_id')
+        chat_id, msg_type = self._resolve_target(event)
         
         await self.send_message(chat_id, message, msg_type)
         
@@ -122,18 +142,19 @@ class ExamplePythonPlugin(PluginBase):
     
     async def handle_stats(self, event, args):
         """处理统计指令"""
-        stats_msg = f"📊 Python插件统计信息\n\n"
-        stats_msg += f"插件名称: {self.info['name']}\n"
-        stats_msg += f"版本: {self.info['version']}\n"
-        stats_msg += f"语言: Python 🐍\n"
-        stats_msg += f"状态: {'✅ 运行中' if self.is_enabled else '❌ 已禁用'}\n\n"
-        stats_msg += f"处理消息数: {self.message_count}\n"
-        stats_msg += f"问候次数: {self.greeting_count}\n"
-        stats_msg += f"指令执行次数: {self.statistics['command_executions']}\n"
-        stats_msg += f"事件处理次数: {self.statistics['events_handled']}\n"
+        stats_msg = (
+            f"📊 Python插件统计信息\n\n"
+            f"插件名称: {self._info_name}\n"
+            f"版本: {self._info_version}\n"
+            f"语言: Python 🐍\n"
+            f"状态: {'✅ 运行中' if self.is_enabled else '❌ 已禁用'}\n\n"
+            f"处理消息数: {self.message_count}\n"
+            f"问候次数: {self.greeting_count}\n"
+            f"指令执行次数: {self.statistics['command_executions']}\n"
+            f"事件处理次数: {self.statistics['events_handled']}\n"
+        )
         
-        msg_type = event.get('message_type', 'private')
-        chat_id = event.get('group_id') if msg_type == 'group' else event.get('user_id')
+        chat_id, msg_type = self._resolve_target(event)
         
         await self.send_message(chat_id, stats_msg, msg_type)
     
@@ -145,8 +166,7 @@ class ExamplePythonPlugin(PluginBase):
             original = ' '.join(args)
             msg = f"🔊 Echo from Python:\n{original}"
         
-        msg_type = event.get('message_type', 'private')
-        chat_id = event.get('group_id') if msg_type == 'group' else event.get('user_id')
+        chat_id, msg_type = self._resolve_target(event)
         
         await self.send_message(chat_id, msg, msg_type)
     
@@ -157,14 +177,19 @@ class ExamplePythonPlugin(PluginBase):
         # 统计消息
         self.message_count += 1
         
-        # 每100条消息保存一次
+        # 延迟保存（由存储的自动刷新任务批量写入，不阻塞消息处理）
+        self.storage.set_deferred('message_count', self.message_count)
+        
+        # 每100条消息输出一次统计
         if self.message_count % 100 == 0:
-            await self.storage.set('message_count', self.message_count)
             self.logger.info(f"消息统计: {self.message_count}")
         
         # 检测Python关键词
         raw_message = event.get('raw_message', '')
-        if 'python' in raw_message.lower() or '🐍' in raw_message:
+        # 先做不分配内存的字符检查，只有可能包含"python"时才转小写
+        if '🐍' in raw_message or (
+            ('p' in raw_message or 'P' in raw_message) and 'python' in raw_message.lower()
+        ):
             # 可以在这里做一些自动回复
             pass
     
@@ -174,7 +199,7 @@ class ExamplePythonPlugin(PluginBase):
         group_id = event.get('group_id')
         
         if user_id and group_id:
-            welcome_msg = f"{CQBuilder.at(user_id)} 欢迎加入！\n"
+            welcome_msg = f"{_at_tag(user_id)} 欢迎加入！\n"
             welcome_msg += "这是Python插件发送的欢迎消息 🐍"
             
             # 延迟2秒发送欢迎消息
@@ -188,8 +213,10 @@ class ExamplePythonPlugin(PluginBase):
         self.logger.info(f"每小时统计 - 消息: {self.message_count}, 问候: {self.greeting_count}")
         
         # 保存统计数据
-        await self.storage.set('message_count', self.message_count)
-        await self.storage.set('greeting_count', self.greeting_count)
+        await self.storage.mset({
+            'message_count': self.message_count,
+            'greeting_count': self.greeting_count
+        })
     
     # ==================== 生命周期钩子 ====================
     
@@ -197,9 +224,14 @@ class ExamplePythonPlugin(PluginBase):
         """插件禁用"""
         await super().on_disable()
         
-        # 保存数据
-        await self.storage.set('message_count', self.message_count)
-        await self.storage.set('greeting_count', self.greeting_count)
+        # 保存数据，并写入剩余的延迟数据
+        await asyncio.gather(
+            self.storage.mset({
+                'message_count': self.message_count,
+                'greeting_count': self.greeting_count
+            }),
+            self.storage.stop_autoflush()
+        )
         
         self.logger.info("已禁用并保存数据")
     
@@ -207,15 +239,20 @@ class ExamplePythonPlugin(PluginBase):
         """插件卸载"""
         await super().on_unload()
         
-        # 最后保存
-        await self.storage.set('message_count', self.message_count)
-        await self.storage.set('greeting_count', self.greeting_count)
+        # 最后保存，并写入剩余的延迟数据
+        await asyncio.gather(
+            self.storage.mset({
+                'message_count': self.message_count,
+                'greeting_count': self.greeting_count
+            }),
+            self.storage.stop_autoflush()
+        )
         
         self.logger.info("已卸载")
 
 
 if __name__ == '__main__':
-    # 使用推荐的 run_plugin 辅助函数
-    # 它会自动处理IPC初始化、事件注册和生命周期管理
-    asyncio.run(run_plugin(ExamplePythonPlugin))
+    # 使用推荐的 start_plugin 辅助函数
+    # 它会自动处理IPC初始化、事件注册和生命周期管理（安装了uvloop时使用其事件循环）
+    start_plugin(ExamplePythonPlugin)
 